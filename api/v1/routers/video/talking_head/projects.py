@@ -20,36 +20,29 @@ async def create_project(
     """
     Create a new video generation project.
     1. Save to DB (queued)
-    2. Submit to Modal (async)
+    2. Submit to Modal (async); the job reports its own progress to the DB
     """
-    # Import here to avoid circular imports if Model is in app.py
-    # We assume 'app' module is available and has 'Model'
+    # Import here to avoid circular imports with app.py
     try:
-        from app import Model
+        from app import ingest_talking_head
     except ImportError:
         # Fallback for local testing or if structure differs
-        raise HTTPException(status_code=500, detail="Model class not found")
+        raise HTTPException(status_code=500, detail="Ingest function not found")
+
+    # 1. Create the DB entry first, so the pipeline can report every
+    #    transition against the project id; call_id is filled in after spawning
+    db_project = db.create_project(project, user_id=project.user_id)
+    if not db_project:
+        raise HTTPException(status_code=500, detail="Failed to save project to DB")
 
-    # 1. Create DB entry (initial)
-    # We need a call_id, but we get it after spawning. 
-    # Strategy: Create DB entry with pending call_id, then update? 
-    # Or spawn first? Spawning is fast.
-    
     try:
-        # Prepare arguments for the model
-        # We need to convert Pydantic model to what Model expects
-        # The Model.submit expects GenerationRequest (or similar arguments)
-        # We'll adapt the Model.submit to take these args or map them here.
-        
-        # For now, let's assume we map it to the existing signature or a new one.
-        # We'll spawn the job.
-        
-        # Note: We are passing URLs. The Model._download_and_validate handles them.
-        # Fix: Instantiate the class before spawning
+        # 2. Spawn the ingest. ingest_talking_head downloads the URLs on a CPU
+        #    container, then chains generation -> upload -> DB update itself.
         # Fix: Convert Pydantic model to dict for Modal
         params_dict = project.parameters.dict() if project.parameters else {}
         
-        job = Model().submit.spawn(
+        job = ingest_talking_head.spawn(
+            project_id=db_project['id'],
             image_url=project.image_url,
             audio_url=project.audio_url,
             audio_url_2=project.audio_url_2, # Pass second audio if available
@@ -59,15 +52,10 @@ async def create_project(
         )
         call_id = job.object_id
         
-        # 2. Save to DB
-        db_project = db.create_project(project, call_id, user_id=project.user_id)
-        
-        if not db_project:
-             raise HTTPException(status_code=500, detail="Failed to save project to DB")
-             
-        return db_project
+        return db.update_project(db_project['id'], {"call_id": call_id}) or {**db_project, "call_id": call_id}
 
     except Exception as e:
+        db.update_status(db_project['id'], "failed", error_message=f"Failed to submit job: {e}", event="failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[ProjectResponse])
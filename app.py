@@ -15,6 +15,19 @@ output_volume = modal.Volume.from_name("creatorify-outputs", create_if_missing=T
 
 MODEL_DIR = "/models"
 OUTPUT_DIR = "/outputs"
+# Content-addressed cache of remote inputs (avatars are reused across videos)
+MEDIA_CACHE_DIR = f"{OUTPUT_DIR}/media_cache"
+# Container-local scratch for renders; they are uploaded straight from here and
+# only copied to the outputs volume when a job asks for an archive
+RENDER_DIR = "/tmp/renders"
+# Default steps per solver for the distilled FusionX checkpoint; the multistep
+# solvers reach the Euler quality in fewer steps
+SAMPLE_SOLVER_STEPS = {"euler": 8, "unipc": 6, "dpm++": 6}
+# DiT shards + InfiniteTalk + FusionX LoRA in one bf16 file, relative to MODEL_DIR
+FUSED_DIT_CHECKPOINT = "InfiniteTalk/fused/infinitetalk_fusionx_bf16.safetensors"
+# Upper bound of one generation (and its upload) in seconds; projects still
+# unfinished after this long are checked against their FunctionCall
+GENERATION_TIMEOUT = 2700
 
 # Define the custom image
 image = (
@@ -42,39 +55,57 @@ image = (
 @app.cls(
     gpu="H100",
     enable_memory_snapshot=True,
-    experimental_options={"enable_gpu_snapshot": True},
     image=image,
     volumes={MODEL_DIR: model_volume, OUTPUT_DIR: output_volume},
     scaledown_window=2,
-    timeout=2700,
+    timeout=GENERATION_TIMEOUT,
     secrets=[
         modal.Secret.from_name("supabase-secrets"),
         modal.Secret.from_name("cloudinary-secrets")
     ]
 )
 class Model:
-    def _download_and_validate(self, url: str, expected_types: list[str]) -> bytes:
-        import magic
-        from fastapi import HTTPException
-        import urllib.request
-        
-        try:
-            with urllib.request.urlopen(url) as response:
-                content = response.read()
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to download from URL {url}: {e}")
-        
-        mime = magic.Magic(mime=True)
-        detected_mime = mime.from_buffer(content)
-        if detected_mime not in expected_types:
-            # Allow generic octet-stream if we trust the source, but better to be strict
-            # For now, just warn or fail
-            pass 
-        return content
+    def _engine_args(self):
+        """Model-level arguments for the long-lived InfiniteTalk engine."""
+        from types import SimpleNamespace
+        from pathlib import Path
 
-    @modal.enter()
+        model_root = Path(MODEL_DIR)
+        fused_dit_path = model_root / FUSED_DIT_CHECKPOINT
+        return SimpleNamespace(
+            task="infinitetalk-14B",
+            ckpt_dir=str(model_root / "Wan2.1-I2V-14B-480P"),
+            infinitetalk_dir=str(model_root / "InfiniteTalk" / "single" / "single" / "infinitetalk.safetensors"),
+            quant_dir=None,
+            wav2vec_dir=str(model_root / "chinese-wav2vec2-base"),
+            dit_path=None,
+            # built by `modal run app.py::fuse_dit_checkpoint`; falls back to the shards when missing
+            fused_dit_path=str(fused_dit_path) if fused_dit_path.exists() else None,
+            lora_dir=[str(model_root / "FusionX_LoRa" / "FusionX_LoRa" / "Wan2.1_I2V_14B_FusionX_LoRA.safetensors")],
+            lora_scale=[1.0],
+            ulysses_size=1,
+            ring_size=1,
+            t5_fsdp=False,
+            t5_cpu=False,
+            dit_fsdp=False,
+            num_persistent_param_in_dit=500000000,
+            quant=None,
+            # built on CPU before the memory snapshot, moved to the GPU after restore
+            defer_device_placement=True,
+            # wav2vec embeddings keyed by audio content, shared across containers
+            audio_emb_cache_dir=str(model_root / "cache" / "audio_emb"),
+            # T5 embeddings of the (mostly default) prompt pairs; T5 stays on CPU on a hit
+            prompt_cache_size=32,
+            prompt_cache_dir=str(model_root / "cache" / "t5"),
+            attn_backend="auto",
+        )
+
+    @modal.enter(snap=True)
     def initialize_model(self):
-        """Initialize the model and audio components when container starts."""
+        """
+        CPU phase of container start, captured by the memory snapshot: download missing
+        weights and build T5/CLIP/VAE/DiT/wav2vec on CPU. Must not touch CUDA.
+        """
         # Add module paths for imports
         import sys
         from pathlib import Path
@@ -82,7 +113,8 @@ class Model:
         
         from huggingface_hub import snapshot_download, hf_hub_download
 
-        print("--- Container starting. Initializing model... ---")
+        print("--- Container starting. Initializing model (CPU phase)... ---")
+        t_phase = time.time()
 
         try:
             # --- Download models if not present using huggingface_hub ---
@@ -253,7 +285,19 @@ class Model:
                 raise RuntimeError(f"Cannot access required models: {download_error}")
 
             print("--- Model downloads completed successfully. ---")
-            print("--- Will initialize models when generate() is called. ---")
+
+            # --- Build the InfiniteTalk engine once per container ---
+            from vendor.infinitetalk.generate_infinitetalk import InfiniteTalkEngine
+
+            os.environ["RANK"] = "0"
+            os.environ["WORLD_SIZE"] = "1"
+            os.environ["LOCAL_RANK"] = "0"
+
+            print("--- Loading InfiniteTalk engine on CPU... ---")
+            t0 = time.time()
+            self.engine = InfiniteTalkEngine(self._engine_args())
+            print(f"--- InfiniteTalk engine built on CPU in {time.time() - t0:.1f}s ---")
+            print(f"--- CPU init phase done in {time.time() - t_phase:.1f}s ---")
 
         except Exception as e:
             print(f"--- Error during initialization: {e} ---")
@@ -261,53 +305,106 @@ class Model:
             traceback.print_exc()
             raise
 
+    @modal.enter(snap=False)
+    def move_model_to_gpu(self):
+        """GPU phase of container start, runs after every snapshot restore."""
+        print("--- Moving InfiniteTalk engine to GPU (GPU phase)... ---")
+        t0 = time.time()
+        self.engine.to_device()
+        print(f"--- GPU init phase done in {time.time() - t0:.1f}s ---")
+
     @modal.method()
-    def _generate_video(self, image: bytes, audio1: bytes, audio2: bytes = None, audio_order: str = "left_right", prompt: str | None = None, params: dict = None) -> str:
+    def _generate_video(self, project_id: str, image_path: str, audio1_path: str, audio2_path: str = None, audio_order: str = "left_right", prompt: str | None = None, params: dict = None) -> str | None:
+        """
+        Render one job and hand the result straight to the upload, so the video
+        URL does not depend on a client polling the status endpoint.
+        """
+        import shutil
+        from pathlib import Path
+        from services.infrastructure.supabase import SupabaseService
+
+        db = SupabaseService()
+        db.update_status(project_id, "processing", 15, event="generation_started")
+        try:
+            video_path = self._render_video(image_path, audio1_path, audio2_path, audio_order, prompt, params)
+        except Exception as e:
+            import traceback
+            print(f"[ERROR] Generation failed: {traceback.format_exc()}")
+            db.update_status(project_id, "failed", error_message=f"Video generation failed: {e}", event="failed")
+            shutil.rmtree(Path(image_path).parent, ignore_errors=True)
+            output_volume.commit()
+            raise
+        db.update_status(project_id, "processing", 90, event="generation_finished")
+
+        try:
+            return self._publish_video(db, project_id, video_path, archive=(params or {}).get('archive_to_volume', False))
+        finally:
+            shutil.rmtree(Path(image_path).parent, ignore_errors=True)
+            output_volume.commit()
+            Path(video_path).unlink(missing_ok=True)
+
+    def _publish_video(self, db, project_id: str, video_path: str, archive: bool = False) -> str | None:
+        """
+        Upload the render from this container's disk (chunked upload), while the
+        optional archive copy to the outputs volume runs in the background.
+        Returns the video URL, or None when the upload failed.
+        """
+        import shutil
+        import threading
+        from pathlib import Path
+        from services.infrastructure.cloudinary import CloudinaryService
+
+        archive_path = Path(OUTPUT_DIR) / "talking_video" / Path(video_path).name
+
+        def archive_video():
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(video_path, archive_path)
+
+        archiver = None
+        if archive:
+            archiver = threading.Thread(target=archive_video, daemon=True)
+            archiver.start()
+
+        db.update_status(project_id, "processing", 95, event="upload_started")
+        t0 = time.time()
+        video_url = CloudinaryService().upload_video(video_path, public_id=f"project_{project_id}")
+        if video_url:
+            print(f"--- Uploaded in {time.time() - t0:.1f}s: {video_url} ---")
+            db.update_status(project_id, "finished", 100, video_url=video_url, event="finished")
+        else:
+            if archiver is None:
+                # keep the render so it can be re-uploaded with upload_video_to_cloudinary
+                archiver = threading.Thread(target=archive_video, daemon=True)
+                archiver.start()
+            db.update_status(project_id, "failed", error_message=f"Cloudinary upload failed, video archived as {archive_path.name}", event="failed")
+
+        if archiver is not None:
+            archiver.join()
+            # committed by the caller together with the input cleanup
+            print(f"--- Archived to {archive_path} ---")
+        return video_url
+
+    def _render_video(self, image_path: str, audio1_path: str, audio2_path: str = None, audio_order: str = "left_right", prompt: str | None = None, params: dict = None) -> str:
+        """Render one job from inputs already ingested to the outputs volume; returns the container-local mp4 path."""
         import sys
         sys.path.extend(["/root", "/root/vendor/infinitetalk", "/root/vendor"])
-        from PIL import Image as PILImage
-        import io
-        import tempfile
-        import time
         from types import SimpleNamespace
         import uuid
-        import magic
-        import json
-        import os
         import shutil
         from pathlib import Path
-        from vendor.infinitetalk.generate_infinitetalk import generate
-        import librosa
+        from wan.utils.audio_ingest import ingest_audio
 
         params = params or {}
         t0 = time.time()
         
         # --- Prepare Inputs ---
-        mime = magic.Magic(mime=True)
-        detected_mime = mime.from_buffer(image)
-        
-        if detected_mime.startswith('video/'):
-            with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp_file:
-                tmp_file.write(image)
-                image_path = tmp_file.name
-        else:
-            source_image = PILImage.open(io.BytesIO(image)).convert("RGB")
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_image:
-                source_image.save(tmp_image.name, "JPEG")
-                image_path = tmp_image.name
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_audio1:
-            tmp_audio1.write(audio1)
-            audio1_path = tmp_audio1.name
+        # written and committed by ingest_talking_head on a CPU container
+        output_volume.reload()
         
         cond_audio_dict = {"person1": audio1_path}
         
         # Handle second audio for multi-person
-        audio2_path = None
-        if audio2:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_audio2:
-                tmp_audio2.write(audio2)
-                audio2_path = tmp_audio2.name
+        if audio2_path:
             cond_audio_dict["person2"] = audio2_path
 
         input_data = {
@@ -316,35 +413,23 @@ class Model:
             "prompt": prompt or "a person is talking",
         }
 
-        input_json_data = {
-            "prompt": input_data["prompt"],
-            "cond_video": input_data["cond_video"],
-            "cond_audio": input_data["cond_audio"]
-        }
-        
         # Map audio_order to audio_type
         if len(input_data["cond_audio"]) > 1:
             if audio_order == "meanwhile":
-                input_json_data["audio_type"] = "para"
+                input_data["audio_type"] = "para"
             elif audio_order == "right_left":
-                input_json_data["audio_type"] = "reverse_add"
+                input_data["audio_type"] = "reverse_add"
             else: # left_right (default)
-                input_json_data["audio_type"] = "add"
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix=".json", delete=False) as tmp_json:
-            json.dump(input_json_data, tmp_json)
-            input_json_path = tmp_json.name
+                input_data["audio_type"] = "add"
         
+        # Decode, resample and normalize the audio once; the engine reuses it for
+        # wav2vec and the muxed track instead of decoding the files again
+        input_data["job_audio"] = ingest_audio(input_data["cond_audio"], input_data.get("audio_type"))
+
         # Calculate frame_num
-        duration1 = librosa.get_duration(path=audio1_path)
-        total_audio_duration = duration1
-        
-        if audio2_path:
-            duration2 = librosa.get_duration(path=audio2_path)
-            if audio_order == "meanwhile":
-                total_audio_duration = max(duration1, duration2)
-            else: # left_right or right_left (sequential)
-                total_audio_duration = duration1 + duration2
+        # the mixed track already lays the speakers out per audio_order
+        # (max of both for "meanwhile", sum for sequential)
+        total_audio_duration = input_data["job_audio"].duration
                 
         audio_embedding_frames = int(total_audio_duration * 25)
         max_possible_frames = max(5, audio_embedding_frames - 5)
@@ -373,108 +458,120 @@ class Model:
             max_frame_num = frame_num
 
         output_filename = f"{uuid.uuid4()}"
-        output_dir = Path(OUTPUT_DIR)
-        model_root = Path(MODEL_DIR)
+        output_dir = Path(RENDER_DIR)
         
-        # Map params to args
+        sample_solver = params.get('sample_solver') or "euler"
+        # Map params to per-job args (model-level args live in self._engine_args())
         args = SimpleNamespace(
             task="infinitetalk-14B",
             size="infinitetalk-480",
             frame_num=chunk_frame_num,
             max_frame_num=max_frame_num,
-            ckpt_dir=str(model_root / "Wan2.1-I2V-14B-480P"),
-            infinitetalk_dir=str(model_root / "InfiniteTalk" / "single" / "single" / "infinitetalk.safetensors"),
-            quant_dir=None,
-            wav2vec_dir=str(model_root / "chinese-wav2vec2-base"),
-            dit_path=None,
-            lora_dir=[str(model_root / "FusionX_LoRa" / "FusionX_LoRa" / "Wan2.1_I2V_14B_FusionX_LoRA.safetensors")],
             lora_scale=[params.get('lora_scale', 1.0)],
             offload_model=False,
             ulysses_size=1,
             ring_size=1,
-            t5_fsdp=False,
-            t5_cpu=False,
-            dit_fsdp=False,
             save_file=str(output_dir / output_filename),
-            audio_save_dir=str(output_dir / "temp_audio"),
+            audio_save_dir=str(output_dir / "temp_audio" / output_filename),
             base_seed=params.get('seed', 42) or 42,
-            input_json=input_json_path,
             motion_frame=25,
             mode=mode,
-            sample_steps=params.get('sample_steps', 8),
+            sample_solver=sample_solver,
+            sample_steps=params.get('sample_steps') or SAMPLE_SOLVER_STEPS[sample_solver],
             sample_shift=params.get('sample_shift', 3.0),
             sample_text_guide_scale=params.get('sample_text_guide_scale', 1.0),
             sample_audio_guide_scale=params.get('sample_audio_guide_scale', 6.0),
-            num_persistent_param_in_dit=500000000,
             audio_mode="localfile",
             use_teacache=True,
             teacache_thresh=0.3,
             use_apg=True,
+            batched_cfg=params.get('batched_cfg', False),
+            motion_latent_carry=params.get('motion_latent_carry', False),
             apg_momentum=-0.75,
             apg_norm_threshold=55,
             color_correction_strength=params.get('color_correction_strength', 0.2),
             scene_seg=False,
-            quant=None,
         )
         
-        os.environ["RANK"] = "0"
-        os.environ["WORLD_SIZE"] = "1"
-        os.environ["LOCAL_RANK"] = "0"
-        
         Path(args.audio_save_dir).mkdir(parents=True, exist_ok=True)
-        generate(args)
-        
-        generated_file = f"{args.save_file}.mp4"
-        
-        # Organize outputs into folders
-        output_subdir = output_dir / "talking_video"
-        output_subdir.mkdir(parents=True, exist_ok=True)
-        
-        final_output_path = output_subdir / f"{output_filename}.mp4"
+        generated_file = self.engine.generate(input_data, args)
+        print(f"--- Video generated in {time.time() - t0:.1f}s ---")
+        if self.engine.teacache_stats:
+            print(f"TeaCache stats (thresh {args.teacache_thresh}): {self.engine.teacache_stats}")
+        if self.engine.stage_timings:
+            print(f"Stage timings: {self.engine.stage_timings}")
+        if self.engine.reset_cache_writes():
+            model_volume.commit()
         
-        if os.path.exists(generated_file):
-            os.rename(generated_file, final_output_path)
-        
-        output_volume.commit()
-        
-        os.unlink(input_json_path)
         if Path(args.audio_save_dir).exists():
             shutil.rmtree(args.audio_save_dir)
-        os.unlink(audio1_path)
-        if audio2_path:
-            os.unlink(audio2_path)
-        os.unlink(image_path)
 
-        return output_filename + ".mp4"
+        return generated_file
 
-    @modal.method()
-    def submit(self, image_url: str, audio_url: str, audio_url_2: str = None, audio_order: str = "left_right", prompt: str = None, params: dict = None):
-        # Download inputs
-        image_bytes = self._download_and_validate(image_url, [
-            "image/jpeg", "image/png", "image/gif", "image/bmp", "image/tiff",
-            "video/mp4", "video/avi", "video/quicktime", "video/webm"
-        ])
-        audio1_bytes = self._download_and_validate(audio_url, ["audio/mpeg", "audio/wav", "audio/x-wav"])
-        
-        audio2_bytes = None
-        if audio_url_2:
-            audio2_bytes = self._download_and_validate(audio_url_2, ["audio/mpeg", "audio/wav", "audio/x-wav"])
-        
-        # Spawn generation
-        return self._generate_video.spawn(image_bytes, audio1_bytes, audio2_bytes, audio_order, prompt, params)
+# --- Input Ingest Function (CPU) ---
+@app.function(
+    image=image,
+    volumes={OUTPUT_DIR: output_volume},
+    timeout=900,
+    secrets=[modal.Secret.from_name("supabase-secrets")]
+)
+def ingest_talking_head(project_id: str, image_url: str, audio_url: str, audio_url_2: str = None, audio_order: str = "left_right", prompt: str = None, params: dict = None):
+    """
+    Download and validate the inputs on a CPU container, then hand only their
+    volume paths to the GPU class, so no GPU time is spent waiting on the network.
+    From here each stage starts the next one (ingest -> generation -> upload)
+    and records the transition on the project.
+    Returns the FunctionCall of the generation, whose id is also stored on the project.
+    """
+    import uuid
+    from services.infrastructure.media_cache import MediaCache
+    from services.infrastructure.supabase import SupabaseService
+    from services.video.talking_head.service import TalkingHeadService
+
+    db = SupabaseService()
+    db.update_status(project_id, "processing", 5, event="ingest_started")
+    t0 = time.time()
+    try:
+        # pick up cache entries committed by other ingest containers
+        output_volume.reload()
+        job_dir = f"{OUTPUT_DIR}/inputs/{uuid.uuid4()}"
+        service = TalkingHeadService(media_cache=MediaCache(MEDIA_CACHE_DIR))
+        paths = service.ingest_inputs(job_dir, image_url, audio_url, audio_url_2)
+        output_volume.commit()
+    except Exception as e:
+        db.update_status(project_id, "failed", error_message=f"Input ingest failed: {e}", event="failed")
+        raise
+    print(f"--- Inputs ingested to {job_dir} in {time.time() - t0:.1f}s ---")
+    db.update_status(project_id, "processing", 10, event="ingest_finished")
+
+    call = Model()._generate_video.spawn(
+        project_id, paths["image_path"], paths["audio1_path"], paths["audio2_path"], audio_order, prompt, params)
+    # lets reconcile_talking_head_projects tell a dead generation from a running one
+    db.update_project(project_id, {"generation_call_id": call.object_id})
+    return call
 
 # --- Upload to Cloudinary Function ---
 @app.function(
     image=image,
     volumes={OUTPUT_DIR: output_volume},
-    timeout=600
+    timeout=600,
+    secrets=[
+        modal.Secret.from_name("supabase-secrets"),
+        modal.Secret.from_name("cloudinary-secrets")
+    ]
 )
 def upload_video_to_cloudinary(project_id: str, output_filename: str):
-    """Upload video from volume to Cloudinary and update database."""
+    """
+    Upload an archived video from the volume to Cloudinary and update database.
+    Renders are uploaded by Model._generate_video directly; this re-uploads one
+    that was kept on the volume after a failed upload.
+    """
     from services.infrastructure.cloudinary import CloudinaryService
     from services.infrastructure.supabase import SupabaseService
     
+    SupabaseService().update_status(project_id, "processing", 95, event="upload_started")
     try:
+        output_volume.reload()
         output_path = f"{OUTPUT_DIR}/talking_video/{output_filename}"
         print(f"[UPLOAD] Reading video from: {output_path}")
         
@@ -482,7 +579,7 @@ def upload_video_to_cloudinary(project_id: str, output_filename: str):
             error_msg = f"Video file not found: {output_path}"
             print(f"[ERROR] {error_msg}")
             db = SupabaseService()
-            db.update_status(project_id, "failed", error_message=error_msg)
+            db.update_status(project_id, "failed", error_message=error_msg, event="failed")
             return None
         
         # Upload to Cloudinary
@@ -494,13 +591,13 @@ def upload_video_to_cloudinary(project_id: str, output_filename: str):
             print(f"[UPLOAD] Success! Video URL: {video_url}")
             # Update database
             db = SupabaseService()
-            db.update_status(project_id, "finished", 100, video_url=video_url)
+            db.update_status(project_id, "finished", 100, video_url=video_url, event="finished")
             return video_url
         else:
             error_msg = "Cloudinary upload failed"
             print(f"[ERROR] {error_msg}")
             db = SupabaseService()
-            db.update_status(project_id, "failed", error_message=error_msg)
+            db.update_status(project_id, "failed", error_message=error_msg, event="failed")
             return None
             
     except Exception as e:
@@ -509,9 +606,56 @@ def upload_video_to_cloudinary(project_id: str, output_filename: str):
         print(f"[ERROR] {error_msg}")
         print(f"[ERROR] Traceback: {traceback.format_exc()}")
         db = SupabaseService()
-        db.update_status(project_id, "failed", error_message=error_msg)
+        db.update_status(project_id, "failed", error_message=error_msg, event="failed")
         return None
 
+# --- Stuck Project Reconciliation (scheduled) ---
+@app.function(
+    image=image,
+    schedule=modal.Period(minutes=15),
+    timeout=300,
+    secrets=[modal.Secret.from_name("supabase-secrets")]
+)
+def reconcile_talking_head_projects():
+    """
+    Mark projects whose job died without recording it as failed. Every stage
+    reports its own errors, but a crashed container or a Modal timeout never
+    reaches that code. Unfinished projects older than GENERATION_TIMEOUT are
+    checked against their generation (or, before it was spawned, ingest)
+    FunctionCall: calls still queued or running are left alone.
+    """
+    from datetime import datetime, timedelta, timezone
+    from services.infrastructure.supabase import SupabaseService
+
+    db = SupabaseService()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=GENERATION_TIMEOUT)
+    for project in db.list_unfinished_projects(created_before=cutoff.isoformat()):
+        project_id = project["id"]
+        call_id = project.get("generation_call_id") or project.get("call_id")
+        if not call_id:
+            db.update_status(project_id, "failed", error_message="Job was never submitted", event="failed")
+            continue
+        try:
+            result = modal.FunctionCall.from_id(call_id).get(timeout=0)
+            # an ingest that returned before its generation call id was stored
+            if isinstance(result, modal.FunctionCall):
+                result = result.get(timeout=0)
+        except TimeoutError:
+            # still queued or running
+            continue
+        except Exception as e:
+            # crashed, timed out or expired: the job can no longer report anything
+            print(f"[RECONCILE] Project {project_id}: call {call_id} died: {e}")
+            db.update_status(project_id, "failed", error_message=f"Video job died: {e}", event="failed")
+            continue
+
+        # the job returned, but its final status write did not land
+        print(f"[RECONCILE] Project {project_id}: call {call_id} returned {result!r}")
+        if result:
+            db.update_status(project_id, "finished", 100, video_url=result, event="finished")
+        else:
+            db.update_status(project_id, "failed", error_message="Video job ended without a video", event="failed")
+
 
 # --- FastAPI App ---
 @app.function(
@@ -593,6 +737,40 @@ def download_models():
         print(f"Error downloading models: {e}")
         raise e
 
+@app.function(
+    image=image,
+    volumes={MODEL_DIR: model_volume},
+    memory=32768,
+    timeout=3600
+)
+def fuse_dit_checkpoint(lora_scale: float = 1.0):
+    """
+    Write the single-file DiT checkpoint the Model class memory-maps at startup.
+    Run with: modal run app.py::fuse_dit_checkpoint
+    Requires the Wan shards, InfiniteTalk and FusionX weights on the volume.
+    """
+    import sys
+    from pathlib import Path
+    sys.path.extend(["/root", "/root/vendor/infinitetalk", "/root/vendor"])
+    from wan.utils.fused_checkpoint import fuse_dit_checkpoint as fuse
+
+    model_root = Path(MODEL_DIR)
+    wan_model_dir = model_root / "Wan2.1-I2V-14B-480P"
+    weight_files = sorted(str(p) for p in wan_model_dir.glob("diffusion_pytorch_model-*.safetensors"))
+    weight_files.append(str(model_root / "InfiniteTalk" / "single" / "single" / "infinitetalk.safetensors"))
+    output_path = model_root / FUSED_DIT_CHECKPOINT
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.time()
+    fuse(
+        weight_files,
+        str(output_path),
+        lora_path=str(model_root / "FusionX_LoRa" / "FusionX_LoRa" / "Wan2.1_I2V_14B_FusionX_LoRA.safetensors"),
+        lora_scale=lora_scale,
+    )
+    print(f"--- Fused checkpoint written to {output_path} in {time.time() - t0:.1f}s ---")
+    model_volume.commit()
+
 @app.function(
     image=image,
     volumes={MODEL_DIR: model_volume, OUTPUT_DIR: output_volume},
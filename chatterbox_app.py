@@ -8,7 +8,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import Optional
-import os
+from contextlib import contextmanager
 
 # Create Modal app
 app = modal.App("chatterbox-tts-service")
@@ -19,17 +19,29 @@ chatterbox_volume = modal.Volume.from_name("chatterbox-models", create_if_missin
 # Define image with torch 2.6.0 and chatterbox-tts
 chatterbox_image = (
     modal.Image.debian_slim(python_version="3.11")
-    .apt_install("ffmpeg", "git")
+    .apt_install("ffmpeg", "git", "libmagic1")
     .pip_install("numpy")  # Install numpy first to avoid pkuseg setup.py error
     .pip_install(
         "chatterbox-tts",  # This will install torch 2.6.0 and all correct dependencies
         "fastapi",
         "python-multipart",
         "loguru",
-        "requests"  # For downloading voice samples
+        "httpx",  # For downloading voice samples
+        "python-magic"
     )
+    .add_local_dir("services/infrastructure", "/root/services/infrastructure", copy=True)
 )
 
+# Voice samples are cached on the model volume, keyed by content, so repeated
+# requests against one sample (e.g. every chunk of a long-form job) reuse it
+MEDIA_CACHE_DIR = "/models/media_cache"
+VOICE_MIME_TYPES = [
+    "audio/mpeg", "audio/wav", "audio/x-wav", "audio/flac", "audio/x-flac",
+    "audio/ogg", "audio/mp4", "audio/x-m4a", "video/mp4", "video/webm",
+]
+MAX_VOICE_SAMPLE_BYTES = 50 * 1024 * 1024
+MAX_SOURCE_AUDIO_BYTES = 10 * 1024 * 1024
+
 # Pydantic models for API
 class TTSRequest(BaseModel):
     text: str
@@ -112,6 +124,33 @@ class ChatterboxModels:
         return self.vc_model
 
 
+_media_cache = None
+
+
+def get_media_cache():
+    """One cache per container, so concurrent requests share in-flight downloads"""
+    global _media_cache
+    if _media_cache is None:
+        from services.infrastructure.media_cache import MediaCache
+        _media_cache = MediaCache(MEDIA_CACHE_DIR)
+    return _media_cache
+
+
+@contextmanager
+def cached_media(url: Optional[str], max_bytes: int = MAX_VOICE_SAMPLE_BYTES):
+    """Yield a local path for `url` (None when no URL is given), mapping fetch errors to HTTP 400"""
+    from services.infrastructure.downloader import MediaDownloadError
+
+    if not url:
+        yield None
+        return
+    try:
+        with get_media_cache().checkout(url, VOICE_MIME_TYPES, max_bytes) as media:
+            yield media.path
+    except MediaDownloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Create FastAPI app
 web_app = FastAPI(title="Chatterbox TTS Microservice")
 
@@ -129,37 +168,25 @@ def generate_tts(request: TTSRequest):
     import torch
     import io
     import soundfile as sf
-    import requests
     
     try:
         models = ChatterboxModels()
         tts_model = models.load_tts()
         
-        # Download voice sample if provided
-        audio_prompt_path = None
-        if request.voice_sample_url:
-            logger.info(f"Downloading voice sample from {request.voice_sample_url}")
-            response = requests.get(request.voice_sample_url)
-            response.raise_for_status()
-            
-            # Save to temp file
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-                f.write(response.content)
-                audio_prompt_path = f.name
-        
-        # Generate audio
-        logger.info(f"Generating TTS: '{request.text[:50]}...'")
-        audio_tensor = tts_model.generate(
-            text=request.text,
-            audio_prompt_path=audio_prompt_path,
-            exaggeration=request.exaggeration,
-            temperature=request.temperature,
-            cfg_weight=request.cfg_weight,
-            repetition_penalty=request.repetition_penalty,
-            min_p=request.min_p,
-            top_p=request.top_p
-        )
+        # Voice sample (if provided) comes from the media cache
+        with cached_media(request.voice_sample_url) as audio_prompt_path:
+            # Generate audio
+            logger.info(f"Generating TTS: '{request.text[:50]}...'")
+            audio_tensor = tts_model.generate(
+                text=request.text,
+                audio_prompt_path=audio_prompt_path,
+                exaggeration=request.exaggeration,
+                temperature=request.temperature,
+                cfg_weight=request.cfg_weight,
+                repetition_penalty=request.repetition_penalty,
+                min_p=request.min_p,
+                top_p=request.top_p
+            )
         
         # Convert to WAV
         audio_np = audio_tensor.squeeze().cpu().numpy()
@@ -167,13 +194,11 @@ def generate_tts(request: TTSRequest):
         sf.write(buffer, audio_np, tts_model.sr, format='WAV')
         buffer.seek(0)
         
-        # Cleanup temp file
-        if audio_prompt_path:
-            os.remove(audio_prompt_path)
-        
         logger.info("TTS generation completed")
         return Response(content=buffer.read(), media_type="audio/wav")
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in TTS generation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -186,7 +211,6 @@ def generate_multilingual_tts(request: MultilingualTTSRequest):
     import torch
     import io
     import soundfile as sf
-    import requests
     
     try:
         # Validate text length (max ~500 characters for stable generation)
@@ -201,32 +225,21 @@ def generate_multilingual_tts(request: MultilingualTTSRequest):
         models = ChatterboxModels()
         multilingual_model = models.load_multilingual()
         
-        # Download voice sample if provided
-        audio_prompt_path = None
-        if request.voice_sample_url:
-            logger.info(f"Downloading voice sample from {request.voice_sample_url}")
-            response = requests.get(request.voice_sample_url, timeout=30)
-            response.raise_for_status()
-            
-            # Save to temp file
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-                f.write(response.content)
-                audio_prompt_path = f.name
-        
-        # Generate audio
-        logger.info(f"Generating multilingual TTS ({request.language_id}): '{request.text[:50]}...' ({len(request.text)} chars)")
-        audio_tensor = multilingual_model.generate(
-            text=request.text,
-            language_id=request.language_id.lower(),
-            audio_prompt_path=audio_prompt_path,
-            exaggeration=request.exaggeration,
-            temperature=request.temperature,
-            cfg_weight=request.cfg_weight,
-            repetition_penalty=request.repetition_penalty,
-            min_p=request.min_p,
-            top_p=request.top_p
-        )
+        # Voice sample (if provided) comes from the media cache
+        with cached_media(request.voice_sample_url) as audio_prompt_path:
+            # Generate audio
+            logger.info(f"Generating multilingual TTS ({request.language_id}): '{request.text[:50]}...' ({len(request.text)} chars)")
+            audio_tensor = multilingual_model.generate(
+                text=request.text,
+                language_id=request.language_id.lower(),
+                audio_prompt_path=audio_prompt_path,
+                exaggeration=request.exaggeration,
+                temperature=request.temperature,
+                cfg_weight=request.cfg_weight,
+                repetition_penalty=request.repetition_penalty,
+                min_p=request.min_p,
+                top_p=request.top_p
+            )
         
         # Convert to WAV
         audio_np = audio_tensor.squeeze().cpu().numpy()
@@ -234,10 +247,6 @@ def generate_multilingual_tts(request: MultilingualTTSRequest):
         sf.write(buffer, audio_np, multilingual_model.sr, format='WAV')
         buffer.seek(0)
         
-        # Cleanup temp file
-        if audio_prompt_path:
-            os.remove(audio_prompt_path)
-        
         logger.info(f"Multilingual TTS generation completed ({request.language_id})")
         return Response(content=buffer.read(), media_type="audio/wav")
         
@@ -255,58 +264,29 @@ def voice_conversion(request: VoiceConversionRequest):
     import torch
     import io
     import soundfile as sf
-    import requests
-    import tempfile
     
     try:
         models = ChatterboxModels()
         vc_model = models.load_vc()
         
-        # Download source audio
-        logger.info(f"Downloading source audio from {request.source_audio_url}")
-        response = requests.get(request.source_audio_url, timeout=60)
-        response.raise_for_status()
+        # Source audio is limited to ~10MB to prevent OOM; both files come from the media cache
+        with cached_media(request.source_audio_url, max_bytes=MAX_SOURCE_AUDIO_BYTES) as source_path, \
+                cached_media(request.target_voice_url) as target_path:
+            # Perform voice conversion
+            logger.info("Performing voice conversion...")
+            audio_tensor = vc_model.generate(
+                audio=source_path,
+                target_voice_path=target_path
+            )
         
-        # Check file size (limit to ~10MB to prevent OOM)
-        if len(response.content) > 10 * 1024 * 1024:
-             raise HTTPException(status_code=400, detail="Source audio too large (max 10MB)")
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-            f.write(response.content)
-            source_path = f.name
+        # Convert to WAV
+        audio_np = audio_tensor.squeeze().cpu().numpy()
+        buffer = io.BytesIO()
+        sf.write(buffer, audio_np, vc_model.sr, format='WAV')
+        buffer.seek(0)
         
-        try:
-            # Download target voice
-            logger.info(f"Downloading target voice from {request.target_voice_url}")
-            response = requests.get(request.target_voice_url, timeout=60)
-            response.raise_for_status()
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-                f.write(response.content)
-                target_path = f.name
-            
-            try:
-                # Perform voice conversion
-                logger.info("Performing voice conversion...")
-                audio_tensor = vc_model.generate(
-                    audio=source_path,
-                    target_voice_path=target_path
-                )
-                
-                # Convert to WAV
-                audio_np = audio_tensor.squeeze().cpu().numpy()
-                buffer = io.BytesIO()
-                sf.write(buffer, audio_np, vc_model.sr, format='WAV')
-                buffer.seek(0)
-                
-                logger.info("Voice conversion completed")
-                return Response(content=buffer.read(), media_type="audio/wav")
-            finally:
-                if os.path.exists(target_path):
-                    os.remove(target_path)
-        finally:
-            if os.path.exists(source_path):
-                os.remove(source_path)
+        logger.info("Voice conversion completed")
+        return Response(content=buffer.read(), media_type="audio/wav")
         
     except HTTPException:
         raise
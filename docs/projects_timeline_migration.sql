@@ -0,0 +1,12 @@
+-- Talking-head project timeline
+-- Run this in your Supabase SQL Editor
+
+-- Ordered list of {"event": ..., "at": ISO timestamp} written by the job
+-- (ingest -> generation -> upload) as it moves through each stage
+alter table public.projects
+  add column if not exists timeline jsonb not null default '[]'::jsonb;
+
+-- FunctionCall id of the generation, written by the ingest when it spawns it;
+-- the scheduled reconciliation uses it to mark jobs that died as failed
+alter table public.projects
+  add column if not exists generation_call_id text;
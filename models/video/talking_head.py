@@ -1,10 +1,11 @@
 from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 from uuid import UUID
 
 class GenerationParams(BaseModel):
-    sample_steps: int = Field(8, description="Number of sampling steps", ge=1, le=50)
+    sample_solver: Literal["euler", "unipc", "dpm++"] = Field("euler", description="Sampling solver")
+    sample_steps: Optional[int] = Field(None, description="Number of sampling steps (defaults per solver: euler 8, unipc/dpm++ 6)", ge=1, le=50)
     sample_shift: float = Field(3.0, description="Sampling shift")
     sample_text_guide_scale: float = Field(1.0, description="Text guidance scale")
     sample_audio_guide_scale: float = Field(6.0, description="Audio guidance scale")
@@ -12,6 +13,9 @@ class GenerationParams(BaseModel):
     color_correction_strength: float = Field(0.2, description="Color correction strength")
     seed: Optional[int] = Field(None, description="Random seed")
     frame_num: Optional[int] = Field(None, description="Force specific frame number (advanced)")
+    batched_cfg: bool = Field(False, description="Run guidance branches as one batched forward (single person only)")
+    motion_latent_carry: bool = Field(False, description="Carry motion latents between windows instead of re-encoding frames (needs color_correction_strength=0)")
+    archive_to_volume: bool = Field(False, description="Also keep the rendered video on the outputs volume (it is always uploaded directly)")
 
 class ProjectCreate(BaseModel):
     user_id: str = "anonymous"
@@ -43,6 +47,7 @@ class ProjectResponse(BaseModel):
     created_at: Optional[str]
     updated_at: Optional[str]
     parameters: Optional[Dict[str, Any]]
+    timeline: Optional[List[Dict[str, Any]]] = None # [{"event": ..., "at": ISO timestamp}]
 
 class ProjectStatus(BaseModel):
     id: str
@@ -50,3 +55,4 @@ class ProjectStatus(BaseModel):
     progress: int
     video_url: Optional[str]
     error_message: Optional[str]
+    timeline: Optional[List[Dict[str, Any]]] = None # queued -> ingest -> generation -> upload -> finished/failed
@@ -3,6 +3,9 @@ import cloudinary
 import cloudinary.uploader
 import cloudinary.api
 
+# Cloudinary requires chunks of at least 5MB
+VIDEO_CHUNK_SIZE = 20 * 1024 * 1024
+
 class CloudinaryService:
     def __init__(self):
         cloud_name = os.environ.get("CLOUDINARY_CLOUD_NAME")
@@ -20,17 +23,20 @@ class CloudinaryService:
             print("Warning: Cloudinary credentials not set. Uploads will be skipped.")
             self.enabled = False
 
-    def upload_video(self, file_path: str, public_id: str = None) -> str:
+    def upload_video(self, file_path: str, public_id: str = None, chunk_size: int = VIDEO_CHUNK_SIZE) -> str:
         if not self.enabled:
             return None
             
         try:
             print(f"Uploading {file_path} to Cloudinary...")
-            response = cloudinary.uploader.upload(
+            # Chunked upload: long renders exceed the single-request size limit,
+            # and a dropped connection only costs one chunk
+            response = cloudinary.uploader.upload_large(
                 file_path, 
                 resource_type="video",
                 public_id=public_id,
-                folder="infinitetalk_outputs"
+                folder="infinitetalk_outputs",
+                chunk_size=chunk_size
             )
             return response.get("secure_url")
         except Exception as e:
@@ -0,0 +1,112 @@
+import os
+import time
+
+import httpx
+import magic
+
+# Bytes handed to libmagic; enough for every container format we accept
+MIME_SNIFF_BYTES = 8192
+
+
+class MediaDownloadError(Exception):
+    """Raised when a remote input cannot be fetched or is not an accepted type."""
+
+
+def download_to_file(
+    url: str,
+    dest_path: str,
+    allowed_mime_types: list[str],
+    max_bytes: int,
+    timeout: float = 30.0,
+    deadline: float = 300.0,
+    chunk_size: int = 1024 * 1024,
+) -> str:
+    """
+    Stream `url` to `dest_path` without holding the body in memory.
+
+    The MIME type is checked on the first bytes, so a wrong file is rejected
+    before the rest of it is downloaded. The file is written to a temporary
+    name and only renamed into place once complete.
+
+    Args:
+        url: Remote file.
+        dest_path: Where the file ends up.
+        allowed_mime_types: MIME types accepted from libmagic.
+        max_bytes: Size limit, checked against Content-Length and while streaming.
+        timeout: Connect / read timeout in seconds for each network operation.
+        deadline: Limit in seconds for the whole download.
+
+    Returns:
+        The detected MIME type.
+    """
+    started = time.monotonic()
+    try:
+        with httpx.stream("GET", url, timeout=timeout, follow_redirects=True) as response:
+            response.raise_for_status()
+            return write_response(url, response, dest_path, allowed_mime_types, max_bytes,
+                                  started + deadline, chunk_size)
+    except httpx.HTTPError as e:
+        raise MediaDownloadError(f"Failed to download from URL {url}: {e}") from e
+
+
+def write_response(
+    url: str,
+    response: httpx.Response,
+    dest_path: str,
+    allowed_mime_types: list[str],
+    max_bytes: int,
+    deadline_at: float,
+    chunk_size: int = 1024 * 1024,
+) -> str:
+    """
+    Write the body of an open streaming `response` to `dest_path`, with the
+    checks of `download_to_file`. Used directly by callers that need to make
+    the request themselves (e.g. conditional requests in the media cache).
+
+    Args:
+        deadline_at: `time.monotonic()` value after which the download is aborted.
+
+    Returns:
+        The detected MIME type.
+    """
+    content_length = response.headers.get("content-length")
+    if content_length and int(content_length) > max_bytes:
+        raise MediaDownloadError(f"{url} is {int(content_length)} bytes, limit is {max_bytes}")
+
+    tmp_path = f"{dest_path}.part"
+    try:
+        detected_mime = None
+        head = b""
+        written = 0
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_bytes(chunk_size):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise MediaDownloadError(f"{url} exceeds the {max_bytes} byte limit")
+                if time.monotonic() > deadline_at:
+                    raise MediaDownloadError(f"{url} did not finish downloading before the deadline")
+                if detected_mime is None:
+                    head += chunk
+                    if len(head) < MIME_SNIFF_BYTES:
+                        continue
+                    detected_mime = _check_mime(url, head, allowed_mime_types)
+                    chunk, head = head, b""
+                f.write(chunk)
+            if detected_mime is None:
+                # the whole file was shorter than the sniff window
+                detected_mime = _check_mime(url, head, allowed_mime_types)
+                f.write(head)
+        os.replace(tmp_path, dest_path)
+        return detected_mime
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _check_mime(url: str, head: bytes, allowed_mime_types: list[str]) -> str:
+    if not head:
+        raise MediaDownloadError(f"{url} is empty")
+    detected_mime = magic.Magic(mime=True).from_buffer(head)
+    if detected_mime not in allowed_mime_types:
+        raise MediaDownloadError(f"{url} has type {detected_mime}, expected one of {allowed_mime_types}")
+    return detected_mime
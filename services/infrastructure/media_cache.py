@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+import httpx
+
+from services.infrastructure.downloader import MediaDownloadError, write_response
+
+DEFAULT_CACHE_BYTES = 10 * 1024 * 1024 * 1024
+# Entries revalidated this recently are served without touching the network,
+# so a burst of requests against one voice sample costs a single round trip
+DEFAULT_REVALIDATE_AFTER = 60.0
+
+
+class CachedMedia(NamedTuple):
+    path: str
+    mime: str
+    sha256: str
+
+
+class MediaCache:
+    """
+    Content-addressed cache of remote media on a (Modal) volume.
+
+    Layout under `root`:
+        blobs/<sha256>   file contents, shared by every URL that serves them
+        index.json       url -> sha256, mime, size, ETag / Last-Modified, last use
+
+    Known URLs are revalidated with a conditional GET (If-None-Match /
+    If-Modified-Since) and only re-downloaded when the server reports a change.
+    Concurrent fetches of one URL in this process share a single download, and
+    the least recently used blobs are evicted once the cache exceeds `max_bytes`.
+    Containers sharing the volume may race on the index; the worst outcome is a
+    duplicate download, since blobs are immutable and written atomically.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        revalidate_after: float = DEFAULT_REVALIDATE_AFTER,
+        timeout: float = 30.0,
+        deadline: float = 300.0,
+    ):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.index_path = os.path.join(root, "index.json")
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self.deadline = deadline
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._index_lock = threading.Lock()
+        self._url_locks = {}
+        self._url_locks_guard = threading.Lock()
+        # sha256 -> number of `checkout` blocks currently using the blob
+        self._pins = {}
+
+    def fetch(self, url: str, allowed_mime_types: list[str], max_bytes: int) -> CachedMedia:
+        """
+        Return the local blob for `url`, downloading or revalidating it as needed.
+
+        Args:
+            url: Remote file.
+            allowed_mime_types: MIME types accepted from libmagic.
+            max_bytes: Size limit of this file.
+
+        Returns:
+            `CachedMedia` with the blob path, its MIME type and content hash.
+        """
+        with self._url_lock(url):
+            entry = self._read_index().get(url)
+            if entry is not None and not os.path.exists(self._blob_path(entry["sha256"])):
+                entry = None
+            if entry is not None:
+                if entry["mime"] not in allowed_mime_types:
+                    raise MediaDownloadError(f"{url} has type {entry['mime']}, expected one of {allowed_mime_types}")
+                if entry["size"] > max_bytes:
+                    raise MediaDownloadError(f"{url} is {entry['size']} bytes, limit is {max_bytes}")
+                if time.time() - entry["validated_at"] < self.revalidate_after:
+                    return self._touch(url, entry)
+            return self._download(url, entry, allowed_mime_types, max_bytes)
+
+    @contextmanager
+    def checkout(self, url: str, allowed_mime_types: list[str], max_bytes: int):
+        """`fetch` that keeps the blob from being evicted while the block runs."""
+        media = self.fetch(url, allowed_mime_types, max_bytes)
+        with self._index_lock:
+            self._pins[media.sha256] = self._pins.get(media.sha256, 0) + 1
+        try:
+            yield media
+        finally:
+            with self._index_lock:
+                self._pins[media.sha256] -= 1
+                if not self._pins[media.sha256]:
+                    del self._pins[media.sha256]
+
+    def _download(self, url: str, entry: Optional[dict], allowed_mime_types: list[str], max_bytes: int) -> CachedMedia:
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        started = time.monotonic()
+        tmp_path = os.path.join(self.blob_dir, f".{uuid.uuid4().hex}")
+        try:
+            with httpx.stream("GET", url, headers=headers, timeout=self.timeout, follow_redirects=True) as response:
+                if response.status_code == 304 and entry is not None:
+                    entry["validated_at"] = time.time()
+                    return self._touch(url, entry)
+                response.raise_for_status()
+                mime = write_response(url, response, tmp_path, allowed_mime_types, max_bytes,
+                                      started + self.deadline)
+                etag = response.headers.get("etag")
+                last_modified = response.headers.get("last-modified")
+        except httpx.HTTPError as e:
+            raise MediaDownloadError(f"Failed to download from URL {url}: {e}") from e
+
+        try:
+            sha256 = _file_sha256(tmp_path)
+            size = os.path.getsize(tmp_path)
+            # identical content from another URL (or an unchanged re-upload) is stored once
+            os.replace(tmp_path, self._blob_path(sha256))
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        now = time.time()
+        entry = {
+            "sha256": sha256,
+            "mime": mime,
+            "size": size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "validated_at": now,
+            "last_used": now,
+        }
+        with self._index_lock:
+            index = self._read_index()
+            index[url] = entry
+            self._evict(index)
+            self._write_index(index)
+        return CachedMedia(self._blob_path(sha256), mime, sha256)
+
+    def _touch(self, url: str, entry: dict) -> CachedMedia:
+        entry["last_used"] = time.time()
+        with self._index_lock:
+            index = self._read_index()
+            index[url] = entry
+            self._write_index(index)
+        return CachedMedia(self._blob_path(entry["sha256"]), entry["mime"], entry["sha256"])
+
+    def _evict(self, index: dict):
+        # blobs shared by several URLs count once and are as recent as their latest use
+        blobs = {}
+        for entry in index.values():
+            size, last_used = blobs.get(entry["sha256"], (entry["size"], 0.0))
+            blobs[entry["sha256"]] = (size, max(last_used, entry["last_used"]))
+        total = sum(size for size, _ in blobs.values())
+        for sha256, (size, _) in sorted(blobs.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if sha256 in self._pins:
+                continue
+            for url in [u for u, e in index.items() if e["sha256"] == sha256]:
+                del index[url]
+            try:
+                os.unlink(self._blob_path(sha256))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index: dict):
+        tmp_path = f"{self.index_path}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blob_dir, sha256)
+
+    @contextmanager
+    def _url_lock(self, url: str):
+        with self._url_locks_guard:
+            lock, waiters = self._url_locks.get(url, (threading.Lock(), 0))
+            self._url_locks[url] = (lock, waiters + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._url_locks_guard:
+                lock, waiters = self._url_locks[url]
+                if waiters == 1:
+                    del self._url_locks[url]
+                else:
+                    self._url_locks[url] = (lock, waiters - 1)
+
+
+def _file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,5 +1,6 @@
 import os
 import json
+from datetime import datetime, timezone
 from supabase import create_client, Client
 from models.video.talking_head import ProjectCreate, ProjectResponse
 
@@ -14,7 +15,7 @@ class SupabaseService:
         else:
             self.client: Client = create_client(url, key)
 
-    def create_project(self, project_data: ProjectCreate, call_id: str, user_id: str = "anonymous") -> dict:
+    def create_project(self, project_data: ProjectCreate, call_id: str = None, user_id: str = "anonymous") -> dict:
         if not self.client:
             return {"id": "mock-id", "status": "queued"}
             
@@ -35,6 +36,7 @@ class SupabaseService:
             "status": "queued",
             "progress": 0,
             "parameters": project_data.parameters.dict() if project_data.parameters else {},
+            "timeline": [_timeline_event("queued")],
         }
         
         # Only add audio_url_2 if it exists to avoid schema errors if column is missing
@@ -62,7 +64,8 @@ class SupabaseService:
             print(f"Error getting project: {e}")
             return None
 
-    def update_status(self, project_id: str, status: str, progress: int = None, video_url: str = None, error_message: str = None):
+    def update_status(self, project_id: str, status: str, progress: int = None, video_url: str = None, error_message: str = None, event: str = None):
+        """Update the project status; `event` is also appended to the project's timeline."""
         if not self.client:
             return
             
@@ -73,12 +76,48 @@ class SupabaseService:
             data["video_url"] = video_url
         if error_message:
             data["error_message"] = error_message
+        if event:
+            # Transitions of one job come from one function at a time, so read-modify-write is safe
+            project = self.get_project(project_id) or {}
+            data["timeline"] = (project.get("timeline") or []) + [_timeline_event(event)]
             
         try:
             self.client.table("projects").update(data).eq("id", project_id).execute()
         except Exception as e:
             print(f"Error updating status: {e}")
 
+    def update_project(self, project_id: str, updates: dict) -> dict:
+        if not self.client:
+            return None
+            
+        try:
+            response = self.client.table("projects").update(updates).eq("id", project_id).execute()
+            if response.data:
+                return response.data[0]
+            return None
+        except Exception as e:
+            print(f"Error updating project: {e}")
+            return None
+
+    def list_unfinished_projects(self, created_before: str, limit: int = 100) -> list:
+        """Projects still queued or processing that were created before `created_before` (ISO timestamp)."""
+        if not self.client:
+            return []
+
+        query = (
+            self.client.table("projects").select("*")
+            .in_("status", ["queued", "processing"])
+            .lt("created_at", created_before)
+            .order("created_at")
+            .limit(limit)
+        )
+        try:
+            response = query.execute()
+            return response.data
+        except Exception as e:
+            print(f"Error listing unfinished projects: {e}")
+            return []
+
     def list_projects(self, user_id: str = None, limit: int = 20, project_type: str = None):
         if not self.client:
             return []
@@ -344,4 +383,8 @@ class SupabaseService:
             return len(response.data) > 0
         except Exception as e:
             print(f"Error deleting Chatterbox project: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+def _timeline_event(event: str) -> dict:
+    return {"event": event, "at": datetime.now(timezone.utc).isoformat()}
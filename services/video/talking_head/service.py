@@ -1,15 +1,80 @@
 """
 Talking Head Video Service
 Handles interaction with the Wan2.1 model for generating talking head videos.
-Currently, the core logic resides in app.py (Modal function), but this service
-will eventually wrap that logic or handle pre/post processing.
+The generation itself runs in app.py (Modal GPU class); this service does the
+CPU-side pre-processing so the GPU container only ever sees local files.
 """
+import os
+import shutil
+from pathlib import Path
+
+from services.infrastructure.downloader import MediaDownloadError, download_to_file
+from services.infrastructure.media_cache import MediaCache
+
+IMAGE_MIME_TYPES = ["image/jpeg", "image/png", "image/gif", "image/bmp", "image/tiff"]
+VIDEO_MIME_TYPES = ["video/mp4", "video/avi", "video/quicktime", "video/webm"]
+AUDIO_MIME_TYPES = ["audio/mpeg", "audio/wav", "audio/x-wav"]
+
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+MAX_VIDEO_BYTES = 500 * 1024 * 1024
+MAX_AUDIO_BYTES = 100 * 1024 * 1024
+
 
 class TalkingHeadService:
-    def __init__(self):
-        pass
+    def __init__(self, media_cache: MediaCache = None):
+        # Avatars are reused across many videos; with a cache only changed files are re-downloaded
+        self.media_cache = media_cache
 
     def validate_inputs(self, image_url: str, audio_url: str):
         """Validate inputs before submission."""
-        # TODO: Implement validation logic
-        pass
+        if not image_url or not audio_url:
+            raise MediaDownloadError("image_url and audio_url are required")
+
+    def ingest_inputs(self, job_dir: str, image_url: str, audio_url: str, audio_url_2: str = None) -> dict:
+        """
+        Download and validate the job inputs into `job_dir`.
+
+        Images are re-encoded to RGB JPEG and videos kept as uploaded, so the
+        GPU side never needs to sniff or convert them.
+
+        Returns:
+            dict with `image_path`, `audio1_path` and `audio2_path` (None for a single speaker).
+        """
+        self.validate_inputs(image_url, audio_url)
+        job_dir = Path(job_dir)
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        source_path = str(job_dir / "source")
+        source_mime = self._fetch(
+            image_url, source_path, IMAGE_MIME_TYPES + VIDEO_MIME_TYPES, max_bytes=MAX_VIDEO_BYTES)
+        if source_mime.startswith("video/"):
+            image_path = str(job_dir / "source.mp4")
+            os.replace(source_path, image_path)
+        else:
+            if os.path.getsize(source_path) > MAX_IMAGE_BYTES:
+                raise MediaDownloadError(f"{image_url} exceeds the {MAX_IMAGE_BYTES} byte image limit")
+            from PIL import Image
+
+            image_path = str(job_dir / "source.jpg")
+            with Image.open(source_path) as source_image:
+                source_image.convert("RGB").save(image_path, "JPEG")
+            os.unlink(source_path)
+
+        audio1_path = str(job_dir / "audio1.wav")
+        self._fetch(audio_url, audio1_path, AUDIO_MIME_TYPES, max_bytes=MAX_AUDIO_BYTES)
+
+        audio2_path = None
+        if audio_url_2:
+            audio2_path = str(job_dir / "audio2.wav")
+            self._fetch(audio_url_2, audio2_path, AUDIO_MIME_TYPES, max_bytes=MAX_AUDIO_BYTES)
+
+        return {"image_path": image_path, "audio1_path": audio1_path, "audio2_path": audio2_path}
+
+    def _fetch(self, url: str, dest_path: str, allowed_mime_types: list, max_bytes: int) -> str:
+        """Place `url` at `dest_path` (through the media cache when there is one) and return its MIME type."""
+        if self.media_cache is None:
+            return download_to_file(url, dest_path, allowed_mime_types, max_bytes=max_bytes)
+        # the job directory is removed after generation, so it gets a copy rather than the blob itself
+        with self.media_cache.checkout(url, allowed_mime_types, max_bytes) as media:
+            shutil.copyfile(media.path, dest_path)
+        return media.mime
@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import torch
+
+from wan.modules import vae
+from wan.modules.vae import WanVAE_
+
+
+update_cache = vae._update_cache
+
+
+def legacy_update_cache(cache, x, cache_t=vae.CACHE_T):
+    # previous behaviour: a fresh clone of the cache slice on every chunk
+    cache_x = x[:, :, -cache_t:, :, :].clone()
+    if cache_x.shape[2] < cache_t and isinstance(cache, torch.Tensor):
+        cache_x = torch.cat([cache[:, :, -1:], cache_x], dim=2)
+    return cache_x
+
+
+def legacy_encode(model, x, scale):
+    # previous behaviour: the output grows with torch.cat every chunk
+    model.clear_cache()
+    iter_ = 1 + (x.shape[2] - 1) // 4
+    for i in range(iter_):
+        model._enc_conv_idx = [0]
+        chunk = x[:, :, :1] if i == 0 else x[:, :, 1 + 4 * (i - 1):1 + 4 * i]
+        out_ = model.encoder(chunk, feat_cache=model._enc_feat_map, feat_idx=model._enc_conv_idx)
+        out = out_ if i == 0 else torch.cat([out, out_], 2)
+    mu, _ = model.conv1(out).chunk(2, dim=1)
+    model.clear_cache()
+    return (mu - scale[0]) * scale[1]
+
+
+def legacy_decode(model, z, scale):
+    model.clear_cache()
+    z = z / scale[1] + scale[0]
+    x = model.conv2(z)
+    for i in range(z.shape[2]):
+        model._conv_idx = [0]
+        out_ = model.decoder(x[:, :, i:i + 1], feat_cache=model._feat_map, feat_idx=model._conv_idx)
+        out = out_ if i == 0 else torch.cat([out, out_], 2)
+    model.clear_cache()
+    return out
+
+
+def timed(fn, *args, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+@torch.no_grad()
+def test_vae_loop():
+    torch.manual_seed(0)
+    # reduced-size Wan VAE: same topology (temporal 4x, spatial 8x), few channels
+    model = WanVAE_(
+        dim=8, z_dim=4, dim_mult=[1, 2, 4, 4], num_res_blocks=1,
+        temperal_downsample=[False, True, True]).eval()
+    scale = [0.0, 1.0]
+
+    for num_frames in (21, 41, 81):
+        video = torch.randn(1, 3, num_frames, 64, 64).clamp(-1, 1)
+
+        vae._update_cache = legacy_update_cache
+        ref_z, t_enc_old = timed(legacy_encode, model, video, scale)
+        ref_x, t_dec_old = timed(legacy_decode, model, ref_z, scale)
+
+        vae._update_cache = update_cache
+        z, t_enc_new = timed(model.encode, video, scale)
+        x, t_dec_new = timed(model.decode, z, scale)
+
+        assert torch.allclose(z, ref_z, atol=1e-5), "encode output changed"
+        assert torch.allclose(x, ref_x, atol=1e-5), "decode output changed"
+        assert x.shape[2] == num_frames, f"decoded {x.shape[2]} frames, expected {num_frames}"
+        print(f"{num_frames:3d} frames | encode {t_enc_old * 1000:7.1f} -> {t_enc_new * 1000:7.1f} ms"
+              f" | decode {t_dec_old * 1000:7.1f} -> {t_dec_new * 1000:7.1f} ms")
+
+    print("SUCCESS: preallocated VAE loops match the concatenating loops.")
+
+
+if __name__ == "__main__":
+    test_vae_loop()
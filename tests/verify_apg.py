@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import torch
+
+from wan.utils.guidance import MomentumBuffer, adaptive_projected_guidance
+
+
+class ReferenceMomentumBuffer:
+    def __init__(self, momentum):
+        self.momentum = momentum
+        self.running_average = 0
+
+    def update(self, update_value):
+        self.running_average = update_value + self.momentum * self.running_average
+
+
+def reference_apg(diff, pred_cond, momentum_buffer=None, eta=0.0, norm_threshold=55):
+    # Reference: the previous float64 implementation
+    if momentum_buffer is not None:
+        momentum_buffer.update(diff)
+        diff = momentum_buffer.running_average
+    if norm_threshold > 0:
+        diff_norm = diff.norm(p=2, dim=[-1, -2, -3, -4], keepdim=True)
+        diff = diff * torch.minimum(torch.ones_like(diff), norm_threshold / diff_norm)
+    dtype = diff.dtype
+    v0, v1 = diff.double(), pred_cond.double()
+    v1 = torch.nn.functional.normalize(v1, dim=[-1, -2, -3, -4])
+    v0_parallel = (v0 * v1).sum(dim=[-1, -2, -3, -4], keepdim=True) * v1
+    v0_orthogonal = v0 - v0_parallel
+    return v0_orthogonal.to(dtype) + eta * v0_parallel.to(dtype)
+
+
+def test_apg():
+    torch.manual_seed(0)
+    # latent-sized [C, T, H, W] like the pipeline, and a batched [B, C, T, H, W]
+    for shape in ((16, 21, 40, 52), (2, 16, 5, 24, 24)):
+        for eta, norm_threshold in ((0.0, 55), (0.5, 55), (0.0, 1e9), (0.0, 0)):
+            buffer, ref_buffer = MomentumBuffer(-0.75), ReferenceMomentumBuffer(-0.75)
+            metrics = []
+            for step in range(6):
+                pred_cond = torch.randn(shape)
+                diff = torch.randn(shape) * (step + 1)
+                expected = reference_apg(diff, pred_cond, ref_buffer, eta, norm_threshold)
+                actual = adaptive_projected_guidance(
+                    diff, pred_cond, buffer, eta, norm_threshold, metrics_hook=metrics.append)
+                assert actual.shape == expected.shape and actual.dtype == expected.dtype
+                err = ((actual - expected).abs().max() / expected.abs().max()).item()
+                assert err < 1e-5, f"shape {shape}, eta {eta}, step {step}: relative error {err}"
+            assert torch.allclose(buffer.running_average, ref_buffer.running_average)
+            assert len(metrics) == (6 if norm_threshold > 0 else 0)
+            print(f"shape {shape} eta {eta} threshold {norm_threshold}: max relative error {err:.2e}")
+
+    print("SUCCESS: float32 APG matches the float64 reference.")
+
+
+if __name__ == "__main__":
+    test_apg()
@@ -0,0 +1,104 @@
+import sys
+import os
+import tempfile
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import numpy as np
+import torch
+from transformers import Wav2Vec2Config, Wav2Vec2FeatureExtractor
+
+from src.audio_analysis.embedder import AudioEmbedder
+from src.audio_analysis.wav2vec2 import Wav2Vec2Model
+from wan.utils.audio_ingest import layout_segments
+
+SR = 16000
+# Both the windows of `embed` and the context padding of `embed_padded` limit what a
+# frame attends to. Against one forward over the whole padded array, the padded
+# embedding may be at most this much further off than the windowed one.
+TOLERANCE = 1.25
+
+
+def save_tiny_wav2vec(path):
+    # random weights; only the architecture (global attention + positional conv) matters here
+    config = Wav2Vec2Config(
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        conv_dim=(16,) * 7,
+        num_conv_pos_embeddings=16,
+        num_conv_pos_embedding_groups=2,
+    )
+    torch.manual_seed(0)
+    Wav2Vec2Model(config).save_pretrained(path)
+    Wav2Vec2FeatureExtractor(do_normalize=True).save_pretrained(path)
+
+
+def relative_error(emb, reference):
+    return ((emb - reference).norm() / reference.norm()).item()
+
+
+def count_frames(embedder):
+    # frames run through the encoder, batch included
+    frames = []
+    encoder_forward = embedder.encoder.forward
+
+    def counting_forward(input_values, *args, **kwargs):
+        frames.append(input_values.shape[0] * kwargs["seq_len"])
+        return encoder_forward(input_values, *args, **kwargs)
+    embedder.encoder.forward = counting_forward
+    return frames
+
+
+def test_audio_embedder():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        save_tiny_wav2vec(tmp)
+        # short windows so the padded arrays span several of them
+        embedder = AudioEmbedder(tmp, window_frames=100, context_frames=20)
+        whole = AudioEmbedder(tmp, window_frames=10000, context_frames=20)
+        spf, context = embedder.samples_per_frame, embedder.context_frames
+
+        speech1 = 0.1 * rng.standard_normal(int(2.3 * SR))
+        speech2 = 0.1 * rng.standard_normal(int(9.1 * SR))
+        for audio_type in ("para", "add", "reverse_add"):
+            for segment in layout_segments(speech1, speech2, audio_type):
+                lead, speech, trail = segment
+                padded = np.concatenate([np.zeros(lead), speech, np.zeros(trail)])
+                reference = whole.embed(padded)
+                windowed = embedder.embed(padded)
+                emb = embedder.embed_padded([segment])[0]
+                assert emb.shape == windowed.shape, (emb.shape, windowed.shape)
+                windowed_err, padded_err = relative_error(windowed, reference), relative_error(emb, reference)
+                assert padded_err <= TOLERANCE * windowed_err, \
+                    f"{audio_type} (lead {lead}, trail {trail}): {padded_err:.3f} vs windowed {windowed_err:.3f}"
+                print(f"{audio_type:12s} lead {lead / SR:5.2f}s trail {trail / SR:5.2f}s: relative error "
+                      f"{padded_err:.3f} (windowed embed {windowed_err:.3f})")
+
+        # a short `add` clip fits one window: embed runs over both speakers' length,
+        # embed_padded only over each speech and its context
+        embedder.silence_embedding()
+        frames = count_frames(embedder)
+        speech1 = 0.1 * rng.standard_normal(int(1.2 * SR))
+        speech2 = 0.1 * rng.standard_normal(int(1.5 * SR))
+        segments = layout_segments(speech1, speech2, "add")
+        for segment in segments:
+            embedder.embed(np.concatenate([np.zeros(segment[0]), segment[1], np.zeros(segment[2])]))
+        full = sum(frames)
+        frames.clear()
+        embedder.embed_padded(list(segments))
+        expected = sum(
+            min(-(-(lead + len(speech)) // spf) + context, (lead + len(speech) + trail) // spf)
+            - max(lead // spf - context, 0)
+            for lead, speech, trail in segments)
+        assert sum(frames) == expected < full, (sum(frames), expected, full)
+        print(f"short add clip: {sum(frames)} frames encoded instead of {full}")
+
+    print(f"SUCCESS: padded embeddings stay within {TOLERANCE}x the windowing error and skip the silence.")
+
+
+if __name__ == "__main__":
+    test_audio_embedder()
@@ -0,0 +1,78 @@
+import sys
+import os
+import tempfile
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from wan.utils.audio_ingest import audio_prepare_single, ingest_audio
+
+
+def reference_prepare_multi(left_path, right_path, audio_type):
+    # the original audio_prepare_multi: every layout materialised with np.concatenate
+    if not (left_path == 'None' or right_path == 'None'):
+        human_speech_array1 = audio_prepare_single(left_path)
+        human_speech_array2 = audio_prepare_single(right_path)
+    elif left_path == 'None':
+        human_speech_array2 = audio_prepare_single(right_path)
+        human_speech_array1 = np.zeros(human_speech_array2.shape[0])
+    elif right_path == 'None':
+        human_speech_array1 = audio_prepare_single(left_path)
+        human_speech_array2 = np.zeros(human_speech_array1.shape[0])
+
+    if audio_type == 'para':
+        max_len = max(human_speech_array1.shape[0], human_speech_array2.shape[0])
+        new_human_speech1 = np.concatenate([human_speech_array1, np.zeros(max_len - human_speech_array1.shape[0])])
+        new_human_speech2 = np.concatenate([human_speech_array2, np.zeros(max_len - human_speech_array2.shape[0])])
+    elif audio_type == 'add':
+        new_human_speech1 = np.concatenate([human_speech_array1, np.zeros(human_speech_array2.shape[0])])
+        new_human_speech2 = np.concatenate([np.zeros(human_speech_array1.shape[0]), human_speech_array2])
+    elif audio_type == 'reverse_add':
+        new_human_speech1 = np.concatenate([np.zeros(human_speech_array2.shape[0]), human_speech_array1])
+        new_human_speech2 = np.concatenate([human_speech_array2, np.zeros(human_speech_array1.shape[0])])
+    return new_human_speech1, new_human_speech2, new_human_speech1 + new_human_speech2
+
+
+def test_audio_ingest():
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        # different source rates, so the resample is part of what is shared
+        path1, path2 = os.path.join(tmp, "a.wav"), os.path.join(tmp, "b.wav")
+        sf.write(path1, 0.1 * rng.standard_normal(int(2.3 * 24000)), 24000)
+        sf.write(path2, 0.1 * rng.standard_normal(int(1.7 * 44100)), 44100)
+        d1, d2 = librosa.get_duration(path=path1), librosa.get_duration(path=path2)
+
+        single = ingest_audio({"person1": path1})
+        assert np.array_equal(single.mix, audio_prepare_single(path1))
+        assert abs(single.duration - d1) < 1e-3
+
+        # previous frame planning: max for "meanwhile", sum for sequential orders
+        layouts = {"para": max, "add": sum, "reverse_add": sum}
+        pairs = ((path1, path2, (d1, d2)), ("None", path2, (d2, d2)), (path1, "None", (d1, d1)))
+        for left, right, durations in pairs:
+            for audio_type, plan in layouts.items():
+                expected_duration = plan(durations)
+                job_audio = ingest_audio({"person1": left, "person2": right}, audio_type)
+                speech1, speech2, mix = reference_prepare_multi(left, right, audio_type)
+                assert np.array_equal(job_audio.mix, mix)
+                for (lead, speech, trail), padded in zip(job_audio.segments, (speech1, speech2)):
+                    assert np.array_equal(np.concatenate([np.zeros(lead), speech, np.zeros(trail)]), padded)
+                assert abs(job_audio.duration - expected_duration) < 1e-3
+                assert job_audio.matches(left, right) and not job_audio.matches(right, left)
+
+                mix_path = job_audio.write_mix(os.path.join(tmp, f"{audio_type}.wav"))
+                written, sr = sf.read(mix_path)
+                assert sr == 16000 and written.shape == mix.shape
+                print(f"{os.path.basename(left):6s} {os.path.basename(right):6s} {audio_type:12s} "
+                      f"duration {job_audio.duration:.3f}s (expected {expected_duration:.3f}s)")
+
+    print("SUCCESS: single-decode audio ingest matches the original concatenated layouts.")
+
+
+if __name__ == "__main__":
+    test_audio_ingest()
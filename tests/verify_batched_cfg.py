@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import torch
+
+from wan.modules.attention import set_attention_backend
+from wan.modules.multitalk_model import WanModel
+
+
+def build_inputs(num_frames=5, lat_h=4, lat_w=4, text_len=16, text_dim=32):
+    lat_t = (num_frames - 1) // 4 + 1
+    latent = torch.randn(16, lat_t, lat_h, lat_w)
+    y = torch.randn(1, 20, lat_t, lat_h, lat_w)
+    clip_fea = torch.randn(1, 257, 1280)
+    context = torch.randn(text_len, text_dim)
+    context_null = torch.randn(text_len, text_dim)
+    audio = torch.randn(1, num_frames, 5, 12, 768)
+    seq_len = lat_t * (lat_h // 2) * (lat_w // 2)
+    # person1, person2 and background masks, as the pipeline builds them for one person
+    ref_target_masks = torch.ones(3, lat_h, lat_w)
+    return latent, y, clip_fea, context, context_null, audio, seq_len, ref_target_masks
+
+
+def test_batched_cfg():
+    set_attention_backend('sdpa')
+
+    torch.manual_seed(0)
+    model = WanModel(
+        text_len=16, in_dim=36, dim=64, ffn_dim=128, freq_dim=32, text_dim=32,
+        out_dim=16, num_heads=4, num_layers=2, intermediate_dim=32, output_dim=64,
+        context_tokens=4).eval()
+
+    latent, y, clip_fea, context, context_null, audio, seq_len, ref_target_masks = build_inputs()
+    t = torch.tensor([900.])
+    common = dict(clip_fea=clip_fea, seq_len=seq_len, y=y, ref_target_masks=ref_target_masks)
+    branches = [
+        dict(context=[context], audio=audio),
+        dict(context=[context_null], audio=audio),
+        dict(context=[context_null], audio=torch.zeros_like(audio)),
+    ]
+
+    with torch.no_grad():
+        sequential = [model([latent], t=t, **common, **branch)[0] for branch in branches]
+        n = len(branches)
+        batched = model(
+            [latent] * n, t=t, context=[b['context'][0] for b in branches], clip_fea=clip_fea,
+            seq_len=seq_len, y=y.expand(n, *y.shape[1:]), audio=[b['audio'] for b in branches],
+            ref_target_masks=ref_target_masks).unbind(0)
+
+    max_diff = max((s - b).abs().max().item() for s, b in zip(sequential, batched))
+    print(f"Max abs difference between batched and sequential branches: {max_diff:.3e}")
+    if all(torch.allclose(s, b, atol=1e-5, rtol=1e-4) for s, b in zip(sequential, batched)):
+        print("Verification PASSED: batched CFG matches sequential CFG.")
+    else:
+        print("Verification FAILED: batched CFG diverges from sequential CFG.")
+    assert max_diff < 1e-4
+
+
+if __name__ == "__main__":
+    test_batched_cfg()
@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import numpy as np
+import torch
+from skimage import color
+
+from wan.utils.multitalk_utils import match_and_blend_colors
+
+
+def skimage_match_and_blend_colors(source_chunk, reference_image, strength):
+    # Reference: the previous frame-by-frame skimage implementation
+    source_np = source_chunk.squeeze(0).permute(1, 2, 3, 0).cpu().numpy()
+    ref_np = reference_image.squeeze(0).squeeze(1).permute(1, 2, 0).cpu().numpy()
+    source_np_01 = np.clip((source_np + 1.0) / 2.0, 0.0, 1.0)
+    ref_np_01 = np.clip((ref_np + 1.0) / 2.0, 0.0, 1.0)
+    ref_lab = color.rgb2lab(ref_np_01)
+
+    frames = []
+    for source_frame in source_np_01:
+        source_lab = color.rgb2lab(source_frame)
+        corrected_lab = source_lab.copy()
+        for j in range(3):
+            mean_src, std_src = source_lab[:, :, j].mean(), source_lab[:, :, j].std()
+            mean_ref, std_ref = ref_lab[:, :, j].mean(), ref_lab[:, :, j].std()
+            if std_src == 0:
+                corrected_lab[:, :, j] = mean_ref
+            else:
+                corrected_lab[:, :, j] = (corrected_lab[:, :, j] - mean_src) * (std_ref / std_src) + mean_ref
+        corrected = np.clip(color.lab2rgb(corrected_lab), 0.0, 1.0)
+        frames.append((1 - strength) * source_frame + strength * corrected)
+
+    out = np.stack(frames, axis=0) * 2.0 - 1.0
+    return torch.from_numpy(out).permute(3, 0, 1, 2).unsqueeze(0).to(source_chunk.dtype)
+
+
+def test_color_correction():
+    torch.manual_seed(0)
+    # slightly out of range values exercise the clipping on both sides
+    source = (torch.rand(1, 3, 9, 32, 48) * 2.2 - 1.1).float()
+    reference = (torch.rand(1, 3, 1, 32, 48) * 2 - 1).float()
+
+    for strength in (0.2, 0.5, 1.0):
+        expected = skimage_match_and_blend_colors(source, reference, strength)
+        actual = match_and_blend_colors(source, reference, strength)
+        assert actual.shape == source.shape and actual.dtype == source.dtype
+        max_err = (actual - expected).abs().max().item()
+        print(f"strength {strength}: max abs error vs skimage {max_err:.2e}")
+        assert max_err < 1e-4, f"torch color correction deviates from skimage by {max_err}"
+
+    assert match_and_blend_colors(source, reference, 0.0) is source
+    print("SUCCESS: batched color correction matches skimage.")
+
+
+if __name__ == "__main__":
+    test_color_correction()
@@ -0,0 +1,94 @@
+import sys
+import os
+import io
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root to sys.path
+sys.path.append(os.getcwd())
+
+from services.infrastructure.media_cache import MediaCache
+
+
+def make_wav(seconds, rate=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\x00\x01" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+class VoiceServer(BaseHTTPRequestHandler):
+    # path -> body; the ETag is derived from the body, like Cloudinary's
+    files = {}
+    hits = {"200": 0, "304": 0}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        body = self.files[self.path]
+        etag = f'"{hash(body)}"'
+        with self.lock:
+            if self.headers.get("If-None-Match") == etag:
+                self.hits["304"] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.hits["200"] += 1
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_media_cache():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VoiceServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    allowed = ["audio/x-wav", "audio/wav"]
+
+    VoiceServer.files["/voice.wav"] = make_wav(1.0)
+    VoiceServer.files["/voice-copy.wav"] = VoiceServer.files["/voice.wav"]
+    with tempfile.TemporaryDirectory() as root:
+        cache = MediaCache(root, revalidate_after=0.0)
+
+        # 20 chunks of a long-form job arriving concurrently: one download
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: cache.fetch(f"{base}/voice.wav", allowed, 10 << 20), range(20)))
+        assert len({r.path for r in results}) == 1
+        assert VoiceServer.hits["200"] == 1, VoiceServer.hits
+        print(f"20 concurrent fetches -> {VoiceServer.hits['200']} download, {VoiceServer.hits['304']} revalidations")
+
+        # identical content under another URL shares the blob
+        copy = cache.fetch(f"{base}/voice-copy.wav", allowed, 10 << 20)
+        assert copy.path == results[0].path
+        assert len(os.listdir(cache.blob_dir)) == 1
+
+        # a changed file is picked up through revalidation
+        VoiceServer.files["/voice.wav"] = make_wav(2.0)
+        changed = cache.fetch(f"{base}/voice.wav", allowed, 10 << 20)
+        assert changed.sha256 != results[0].sha256
+        with open(changed.path, "rb") as f:
+            assert f.read() == VoiceServer.files["/voice.wav"]
+
+        # LRU by bytes: a budget of one file keeps only the latest
+        small = MediaCache(os.path.join(root, "small"), max_bytes=len(make_wav(2.0)))
+        small.fetch(f"{base}/voice-copy.wav", allowed, 10 << 20)
+        latest = small.fetch(f"{base}/voice.wav", allowed, 10 << 20)
+        assert os.listdir(small.blob_dir) == [latest.sha256]
+        print(f"hits after revalidation and eviction checks: {VoiceServer.hits}")
+
+    server.shutdown()
+    print("SUCCESS: media cache deduplicates, revalidates and evicts as expected.")
+
+
+if __name__ == "__main__":
+    test_media_cache()
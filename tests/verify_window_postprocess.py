@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+
+# Add the project root and the vendored InfiniteTalk package to sys.path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "vendor", "infinitetalk"))
+
+import torch
+
+from wan.utils.multitalk_utils import StageTimer, WindowPostProcessor, match_and_blend_colors
+
+
+class RecordingSink:
+    # stands in for StreamingVideoWriter; encoding is simulated with a sleep
+    def __init__(self, encode_seconds=0.05):
+        self.encode_seconds = encode_seconds
+        self.frames = []
+        self.closed = False
+
+    def write(self, frames, color_reference=None, color_strength=0.0):
+        time.sleep(self.encode_seconds)
+        self.frames.append(frames.clone())
+
+    def close(self):
+        self.closed = True
+        return "out.mp4"
+
+    def abort(self):
+        self.closed = True
+
+
+def test_window_postprocess():
+    torch.manual_seed(0)
+    reference = torch.rand(1, 3, 1, 32, 32) * 2 - 1
+    windows = [torch.rand(1, 3, 4, 32, 32) * 2 - 1 for _ in range(4)]
+
+    timer = StageTimer()
+    sink = RecordingSink()
+    post = WindowPostProcessor(sink, timer=timer)
+    for window in windows:
+        # the "denoise" of the next window runs while the worker post-processes
+        with timer.stage('denoise'):
+            post.write(window, reference, 0.5)
+            time.sleep(0.05)
+    assert post.close() == "out.mp4" and sink.closed
+    timer.stop()
+
+    assert len(sink.frames) == len(windows), "windows were dropped"
+    for window, written in zip(windows, sink.frames):
+        assert torch.equal(written, match_and_blend_colors(window, reference, 0.5)), "windows out of order"
+
+    summary = timer.summary()
+    print(f"stage timings: {summary}")
+    assert summary['stages']['encode']['calls'] == len(windows)
+    assert summary['overlap'] > 0.5, "post-processing did not overlap with denoising"
+
+    # worker errors surface in the caller instead of being lost
+    class FailingSink(RecordingSink):
+        def write(self, frames, color_reference=None, color_strength=0.0):
+            raise OSError("ffmpeg exited")
+
+    post = WindowPostProcessor(FailingSink())
+    post.write(windows[0])
+    try:
+        post.close()
+    except RuntimeError as e:
+        assert isinstance(e.__cause__, OSError)
+    else:
+        raise AssertionError("worker error was swallowed")
+
+    print("SUCCESS: windows are post-processed in order, in the background.")
+
+
+if __name__ == "__main__":
+    test_window_postprocess()